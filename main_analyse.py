@@ -9,14 +9,12 @@ SRC_DIR = os.path.join(ROOT, "src")
 if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
-# --- Import from your analysis package ---
-from analysis.analysis import load_session
-from analysis.plotting import (
-    plot_avg_fft,
-    plot_avg_envelope_fft,
-    plot_concat_time_domain,
-)
-from analysis.io import suggest_output_dir  # to decide where to save SVGs
+from src.startup import warm_up_imports
+
+# --- Analysis modules are heavy (numpy/scipy/matplotlib/soundfile) ---
+# They are imported inside run_selected and warmed up in the background while
+# the user picks a folder, so the window appears immediately.
+HEAVY_MODULES = ("analysis.analysis", "analysis.plotting", "analysis.watch", "analysis.preview")
 
 def browse_path(entry):
     path = filedialog.askdirectory(
@@ -26,87 +24,231 @@ def browse_path(entry):
         entry.delete(0, tk.END)
         entry.insert(0, path)
 
-def run_selected(selection_path, do_fft, do_env, do_time, do_save):
+def parse_bands(text):
+    """
+    Parse "2000-5000, 5000-10000" into [(2000.0, 5000.0), (5000.0, 10000.0)].
+    Raises ValueError on malformed input.
+    """
+    bands = []
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, hi = (float(v) for v in part.split("-"))
+        if not 0 <= lo < hi:
+            raise ValueError(f"Invalid band: {part}")
+        bands.append((lo, hi))
+    if not bands:
+        raise ValueError("No bands given")
+    return bands
+
+def parse_optional_float(text):
+    """
+    Empty text -> None, otherwise float (ValueError if malformed).
+    """
+    text = text.strip()
+    return float(text) if text else None
+
+def run_selected(selection_path, do_fft, do_env, do_time, do_save, save_formats, do_watch,
+                 do_bands, bands_text, do_preview, preview_target_text, preview_budget_text):
     if not os.path.isdir(selection_path):
         messagebox.showerror("Error", "Please select a valid folder.")
         return
 
+    bands = None
+    if do_bands.get():
+        try:
+            bands = parse_bands(bands_text)
+        except ValueError:
+            messagebox.showerror("Error", "Bands must look like: 2000-5000, 5000-10000")
+            return
+
+    try:
+        preview_target = parse_optional_float(preview_target_text)
+        preview_budget = parse_optional_float(preview_budget_text)
+    except ValueError:
+        messagebox.showerror("Error", "Preview stop conditions must be numbers (or left empty).")
+        return
+
     # Close GUI before plotting to avoid event loop clashes
     root.destroy()
 
+    from analysis.analysis import load_session
+    from analysis.plotting import (
+        plot_avg_fft,
+        plot_avg_envelope_fft,
+        plot_concat_time_domain,
+        plot_band_envelope_fft,
+        render_saved_plots,
+    )
+    from analysis.watch import watch_session
+    from analysis.preview import preview_avg_fft
+    from analysis.io import suggest_output_dir  # to decide where to save plots
+    from analysis.dsp import band_error
+
+    formats = [fmt for fmt, var in save_formats.items() if var.get()] or ["svg"]
+
+    if bands and (do_watch.get() or do_preview.get()):
+        print("Band Envelope FFT is not available in watch / preview mode; bands are ignored.")
+
+    # Watch mode: follow a folder that is still being recorded (FFT / envelope only)
+    if do_watch.get():
+        watch_session(
+            selection_path,
+            interval_s=2.0,
+            do_fft=do_fft.get(),
+            do_env=do_env.get(),
+            fft_xlim_hz=3000,
+            env_xlim_hz=1000,
+            save_dir=suggest_output_dir(selection_path) if do_save.get() else None,
+            formats=formats,
+            idle_stop_s=30.0 if do_save.get() else None,
+        )
+        return
+
+    # Preview: sampled chunks first, refined in the background (FFT / envelope only)
+    if do_preview.get():
+        preview_avg_fft(
+            selection_path,
+            do_fft=do_fft.get(),
+            do_env=do_env.get(),
+            fft_xlim_hz=3000,
+            env_xlim_hz=1000,
+            target_rel_sem=preview_target / 100 if preview_target is not None else None,
+            time_budget_s=preview_budget,
+        )
+        return
+
     # Load selection (session / instance / chunks)
     results = load_session(selection_path)
     if not results["instances"]:
         print("No valid audio found. Ensure you selected a session/instance/chunks with 1-second WAV files.")
         return
 
-    # If saving, decide where to save
-    save_dir = suggest_output_dir(selection_path) if do_save.get() else None
-
-    if do_fft.get():
-        plot_avg_fft(
+    # Bands can only be checked once the samplerate and chunk length are known
+    if bands:
+        sr = results["samplerate"]
+        N = len(results["chunks"][results["instances"][0]][0])
+        usable = []
+        for lo, hi in bands:
+            err = band_error(lo, hi, sr, N)
+            if err:
+                print(f"Skipping {err}.")
+            else:
+                usable.append((lo, hi))
+        bands = usable or None
+        if not bands:
+            print("No usable bands; skipping the band envelope plot.")
+
+    # Saving: one feature pass, figures rendered off-screen in parallel
+    if do_save.get():
+        render_saved_plots(
             results,
-            xlim_hz=3000,
-            save_dir=save_dir,
-            filename="avg_fft.svg",
-            file_format="svg",
+            save_dir=suggest_output_dir(selection_path),
+            do_fft=do_fft.get(),
+            do_env=do_env.get(),
+            do_time=do_time.get(),
+            formats=formats,
+            fft_xlim_hz=3000,
+            env_xlim_hz=1000,
+            max_seconds=10,
+            bands=bands,
+            bands_xlim_hz=500,
         )
+        return
+
+    if do_fft.get():
+        plot_avg_fft(results, xlim_hz=3000)
 
     if do_env.get():
-        plot_avg_envelope_fft(
-            results,
-            xlim_hz=1000,
-            save_dir=save_dir,
-            filename="avg_envelope_fft.svg",
-            file_format="svg",
-        )
+        plot_avg_envelope_fft(results, xlim_hz=1000)
 
     if do_time.get():
-        plot_concat_time_domain(
-            results,
-            max_seconds=10,
-            save_dir=save_dir,
-            filename="concat_time.svg",
-            file_format="svg",
-        )
+        plot_concat_time_domain(results, max_seconds=10)
+
+    if bands:
+        plot_band_envelope_fft(results, bands=bands, xlim_hz=500)
 
 # --- GUI ---
-root = tk.Tk()
-root.title("Acoustic Analysis")
-
-frm = tk.Frame(root, padx=12, pady=12)
-frm.pack(fill="both", expand=True)
-
-# Path selector
-tk.Label(frm, text="Session / Instance / Chunks:").grid(row=0, column=0, sticky="w")
-path_entry = tk.Entry(frm, width=70)
-path_entry.grid(row=0, column=1, padx=6)
-tk.Button(frm, text="Browse", command=lambda: browse_path(path_entry)).grid(row=0, column=2)
-
-# Feature checkboxes
-tk.Label(frm, text="Select features to run:").grid(row=1, column=0, columnspan=3, sticky="w", pady=(12, 4))
-do_fft = tk.BooleanVar(value=True)
-do_env = tk.BooleanVar(value=True)
-do_time = tk.BooleanVar(value=True)
-tk.Checkbutton(frm, text="Average FFT", variable=do_fft).grid(row=2, column=0, sticky="w")
-tk.Checkbutton(frm, text="Envelope FFT", variable=do_env).grid(row=2, column=1, sticky="w")
-tk.Checkbutton(frm, text="Concatenated Time-Domain", variable=do_time).grid(row=2, column=2, sticky="w")
-
-# Save toggle
-tk.Label(frm, text="Output:").grid(row=3, column=0, sticky="w", pady=(12, 0))
-do_save = tk.BooleanVar(value=False)
-tk.Checkbutton(frm, text="Save plots as SVG (no interactive display)", variable=do_save).grid(
-    row=3, column=1, sticky="w", columnspan=2
-)
-
-# Buttons
-btn_frame = tk.Frame(frm, pady=12)
-btn_frame.grid(row=4, column=0, columnspan=3, sticky="e")
-tk.Button(
-    btn_frame,
-    text="Run",
-    command=lambda: run_selected(path_entry.get(), do_fft, do_env, do_time, do_save),
-).pack(side="right", padx=6)
-tk.Button(btn_frame, text="Quit", command=root.destroy).pack(side="right")
-
-root.mainloop()
+# Guarded so render worker processes (spawn start method) don't rebuild the window
+if __name__ == "__main__":
+    warm_up_imports(HEAVY_MODULES)
+
+    root = tk.Tk()
+    root.title("Acoustic Analysis")
+
+    frm = tk.Frame(root, padx=12, pady=12)
+    frm.pack(fill="both", expand=True)
+
+    # Path selector
+    tk.Label(frm, text="Session / Instance / Chunks:").grid(row=0, column=0, sticky="w")
+    path_entry = tk.Entry(frm, width=70)
+    path_entry.grid(row=0, column=1, padx=6)
+    tk.Button(frm, text="Browse", command=lambda: browse_path(path_entry)).grid(row=0, column=2)
+
+    # Feature checkboxes
+    tk.Label(frm, text="Select features to run:").grid(row=1, column=0, columnspan=3, sticky="w", pady=(12, 4))
+    do_fft = tk.BooleanVar(value=True)
+    do_env = tk.BooleanVar(value=True)
+    do_time = tk.BooleanVar(value=True)
+    tk.Checkbutton(frm, text="Average FFT", variable=do_fft).grid(row=2, column=0, sticky="w")
+    tk.Checkbutton(frm, text="Envelope FFT", variable=do_env).grid(row=2, column=1, sticky="w")
+    tk.Checkbutton(frm, text="Concatenated Time-Domain", variable=do_time).grid(row=2, column=2, sticky="w")
+
+    # Demodulation bands (Hz) for the band envelope filter bank
+    do_bands = tk.BooleanVar(value=False)
+    tk.Checkbutton(frm, text="Band Envelope FFT (Hz):", variable=do_bands).grid(row=3, column=0, sticky="w")
+    bands_entry = tk.Entry(frm, width=40)
+    bands_entry.insert(0, "2000-5000, 5000-10000, 10000-20000")
+    bands_entry.grid(row=3, column=1, sticky="w", padx=6)
+
+    # Save toggle
+    tk.Label(frm, text="Output:").grid(row=4, column=0, sticky="w", pady=(12, 0))
+    do_save = tk.BooleanVar(value=False)
+    tk.Checkbutton(frm, text="Save plots (no interactive display)", variable=do_save).grid(
+        row=4, column=1, sticky="w", columnspan=2
+    )
+    save_formats = {
+        "svg": tk.BooleanVar(value=True),
+        "png": tk.BooleanVar(value=False),
+        "pdf": tk.BooleanVar(value=False),
+    }
+    fmt_frame = tk.Frame(frm)
+    fmt_frame.grid(row=5, column=1, sticky="w", columnspan=2)
+    for fmt, var in save_formats.items():
+        tk.Checkbutton(fmt_frame, text=fmt.upper(), variable=var).pack(side="left")
+
+    # Watch toggle
+    do_watch = tk.BooleanVar(value=False)
+    tk.Checkbutton(frm, text="Watch folder while recording (live FFT / envelope)", variable=do_watch).grid(
+        row=6, column=1, sticky="w", columnspan=2
+    )
+
+    # Preview toggle + stop conditions (empty = no limit)
+    do_preview = tk.BooleanVar(value=False)
+    tk.Checkbutton(frm, text="Quick preview (sampled chunks, refines in background)", variable=do_preview).grid(
+        row=7, column=1, sticky="w", columnspan=2
+    )
+    preview_frame = tk.Frame(frm)
+    preview_frame.grid(row=8, column=1, sticky="w", columnspan=2)
+    tk.Label(preview_frame, text="Stop at rel. error (%):").pack(side="left")
+    preview_target_entry = tk.Entry(preview_frame, width=6)
+    preview_target_entry.insert(0, "5")
+    preview_target_entry.pack(side="left", padx=(0, 12))
+    tk.Label(preview_frame, text="Time budget (s):").pack(side="left")
+    preview_budget_entry = tk.Entry(preview_frame, width=6)
+    preview_budget_entry.pack(side="left")
+
+    # Buttons
+    btn_frame = tk.Frame(frm, pady=12)
+    btn_frame.grid(row=9, column=0, columnspan=3, sticky="e")
+    tk.Button(
+        btn_frame,
+        text="Run",
+        command=lambda: run_selected(path_entry.get(), do_fft, do_env, do_time, do_save, save_formats, do_watch,
+                                     do_bands, bands_entry.get(), do_preview,
+                                     preview_target_entry.get(), preview_budget_entry.get()),
+    ).pack(side="right", padx=6)
+    tk.Button(btn_frame, text="Quit", command=root.destroy).pack(side="right")
+
+    root.mainloop()
@@ -1,15 +1,23 @@
+from src.startup import warm_up_imports
 from src.config.session_config import load_last_config, save_last_config
 from src.gui.session_gui import collect_session_info
-from src.recording.recorder import start_recording_session
 from src.metadata.manifest import save_manifest_and_notes
 
+# sounddevice (PortAudio init) and pynput are slow to import; load them in the
+# background while the setup dialogs are open instead of before they appear.
+HEAVY_MODULES = ("src.recording.recorder", "sounddevice", "pynput.keyboard")
+
 def main():
+    warm_up_imports(HEAVY_MODULES)
+
     last_config = load_last_config()
     session_info = collect_session_info(last_config)
     save_last_config(session_info)
 
+    from src.recording.recorder import start_recording_session
+
     session_path, instance_folder_name, chunk_metadata = start_recording_session(session_info)
     save_manifest_and_notes(session_info, session_path, instance_folder_name, chunk_metadata)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
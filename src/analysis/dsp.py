@@ -1,6 +1,7 @@
+from functools import lru_cache
 import numpy as np
 from scipy.signal import windows, hilbert
-from scipy.fft import rfft, rfftfreq
+from scipy.fft import rfft, rfftfreq, ifft, next_fast_len
 
 def rms_normalize(x: np.ndarray) -> np.ndarray:
     if x.size == 0:
@@ -8,8 +9,14 @@ def rms_normalize(x: np.ndarray) -> np.ndarray:
     rms = float(np.sqrt(np.mean(x**2)))
     return x / rms if rms > 0 else x
 
+@lru_cache(maxsize=8)
+def _hann(N: int) -> np.ndarray:
+    w = windows.hann(N)
+    w.flags.writeable = False
+    return w
+
 def apply_hann(x: np.ndarray) -> np.ndarray:
-    return x * windows.hann(len(x))
+    return x * _hann(len(x))
 
 def rfft_mag(x: np.ndarray) -> np.ndarray:
     return np.abs(rfft(x)) / len(x)
@@ -18,4 +25,57 @@ def rfftfreq_hz(N: int, sr: int) -> np.ndarray:
     return rfftfreq(N, d=1.0 / sr)
 
 def envelope(x: np.ndarray) -> np.ndarray:
-    return np.abs(hilbert(x))
\ No newline at end of file
+    return np.abs(hilbert(x))
+
+def _band_bins(lo: float, hi: float, N: int, sr: int) -> tuple:
+    k0 = max(1, int(np.ceil(lo * N / sr)))
+    k1 = min(N // 2, int(np.floor(hi * N / sr)) + 1)
+    return k0, k1
+
+def band_error(lo: float, hi: float, sr: int, N: int) -> str | None:
+    """
+    Why a band can't be demodulated for chunks of N samples at sr, or None if it can.
+    """
+    if not (0 <= lo < hi <= sr / 2):
+        return f"band {lo:g}-{hi:g} Hz is outside 0-{sr / 2:g} Hz (Nyquist)"
+    k0, k1 = _band_bins(lo, hi, N, sr)
+    if k1 <= k0:
+        return f"band {lo:g}-{hi:g} Hz is narrower than one FFT bin ({sr / N:g} Hz)"
+    return None
+
+@lru_cache(maxsize=8)
+def _band_plan(N: int, sr: int, bands: tuple) -> tuple:
+    """
+    Per band: (first_bin, stop_bin, M, taper). M is the decimated IFFT length,
+    ~4x the band width in bins so the envelope spectrum isn't aliased.
+    """
+    plan = []
+    for lo, hi in bands:
+        err = band_error(lo, hi, sr, N)
+        if err:
+            raise ValueError(f"Invalid {err}")
+        k0, k1 = _band_bins(lo, hi, N, sr)
+        nb = k1 - k0
+        taper = windows.tukey(nb, 0.1)
+        taper.flags.writeable = False
+        plan.append((k0, k1, next_fast_len(4 * nb), taper))
+    return tuple(plan)
+
+def band_envelopes(x: np.ndarray, sr: int, bands) -> list:
+    """
+    Band-pass + Hilbert envelope for several bands from one shared FFT.
+
+    Each band's bins are shifted to baseband (which doesn't change the envelope)
+    and inverse-transformed at a decimated length, so the cost per band scales
+    with its width rather than the chunk length.
+    Returns [(env, env_sr), ...] in band order.
+    """
+    N = len(x)
+    X = rfft(x)
+    out = []
+    for k0, k1, M, taper in _band_plan(N, sr, tuple((float(lo), float(hi)) for lo, hi in bands)):
+        Z = np.zeros(M, dtype=np.complex128)
+        Z[:k1 - k0] = X[k0:k1] * taper
+        z = ifft(Z) * (2.0 * M / N)
+        out.append((np.abs(z), sr * M / N))
+    return out
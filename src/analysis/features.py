@@ -1,5 +1,8 @@
 import numpy as np
-from .dsp import rms_normalize, apply_hann, rfft_mag, rfftfreq_hz, envelope
+from .dsp import rms_normalize, apply_hann, rfft_mag, rfftfreq_hz, envelope, band_envelopes
+
+# Default demodulation bands (Hz) for bearing / gear-mesh resonances
+DEFAULT_DEMOD_BANDS = ((2000, 5000), (5000, 10000), (10000, 20000))
 
 def avg_fft(chunks, sr):
     """
@@ -32,6 +35,17 @@ def avg_envelope_fft(chunks, sr):
     avg = acc / len(chunks)
     return rfftfreq_hz(N, sr), rms_normalize(avg)
 
+def avg_band_envelope_fft(chunks, sr, bands=DEFAULT_DEMOD_BANDS):
+    """
+    Average envelope spectrum per demodulation band, RMS-normalized.
+    Every chunk is transformed once and shared by all bands.
+    Returns [(freqs, mag), ...] in band order.
+    """
+    acc = SpectralAccumulator(sr, do_fft=False, do_env=False, bands=bands)
+    for x in chunks:
+        acc.add(x)
+    return acc.result()["bands"]
+
 def concat_time(chunks):
     """
     Concatenate chunks into one long time series and RMS-normalize.
@@ -40,3 +54,197 @@ def concat_time(chunks):
         return np.array([])
     y = np.concatenate(chunks)
     return rms_normalize(y)
+
+def concat_first_seconds(chunks, sr, max_seconds: float) -> np.ndarray:
+    """
+    Concatenate only up to 'max_seconds' of audio from the list of chunks.
+    This avoids allocating the full recording if it's long.
+    """
+    if not chunks:
+        return np.array([])
+    if not max_seconds or max_seconds <= 0:
+        # Fallback: full concat (not ideal for huge sets)
+        return concat_time(chunks)
+
+    max_samples = int(sr * max_seconds)
+    if max_samples <= 0:
+        return np.array([])
+
+    buf = []
+    count = 0
+    for x in chunks:
+        remain = max_samples - count
+        if remain <= 0:
+            break
+        take = min(len(x), remain)
+        buf.append(x[:take])
+        count += take
+
+    if not buf:
+        return np.array([])
+
+    y = np.concatenate(buf)
+    return rms_normalize(y)
+
+class SpectralAccumulator:
+    """
+    Running sums behind avg_fft / avg_envelope_fft / avg_band_envelope_fft, so
+    chunks can be folded in as they arrive. result() matches the batch
+    functions on the same chunks.
+    """
+
+    def __init__(self, sr, do_fft=True, do_env=True, bands=None, track_spread=False):
+        self.sr = sr
+        self.do_fft = do_fft
+        self.do_env = do_env
+        self.track_spread = track_spread  # also keep sums of squares for rel_sem()
+        self.bands = tuple(bands) if bands else ()
+        self.N = None
+        self.count = 0
+        self._fft_acc = None
+        self._env_acc = None
+        self._fft_sq = None
+        self._env_sq = None
+        self._band_accs = [None] * len(self.bands)
+        self._band_axes = [None] * len(self.bands)  # (envelope length, envelope sr)
+
+    def add(self, x: np.ndarray) -> None:
+        if self.N is None:
+            self.N = len(x)
+        if self.do_fft:
+            X = rfft_mag(apply_hann(rms_normalize(x)))
+            self._fft_acc = X if self._fft_acc is None else (self._fft_acc + X)
+            if self.track_spread:
+                self._fft_sq = X**2 if self._fft_sq is None else (self._fft_sq + X**2)
+        if self.do_env:
+            E = rfft_mag(envelope(x))
+            self._env_acc = E if self._env_acc is None else (self._env_acc + E)
+            if self.track_spread:
+                self._env_sq = E**2 if self._env_sq is None else (self._env_sq + E**2)
+        if self.bands:
+            for i, (env, env_sr) in enumerate(band_envelopes(x, self.sr, self.bands)):
+                B = rfft_mag(env)
+                self._band_accs[i] = B if self._band_accs[i] is None else (self._band_accs[i] + B)
+                self._band_axes[i] = (len(env), env_sr)
+        self.count += 1
+
+    def rel_sem(self, key: str = "fft", max_hz=None) -> float:
+        """
+        Magnitude-weighted relative standard error of the averaged spectrum up
+        to max_hz, i.e. ||SEM|| / ||mean||: how much the curve could still move
+        as more chunks are added. Weighting by magnitude keeps the noise floor
+        (which fluctuates ~50% per chunk) from dominating over the peaks.
+        Needs track_spread=True; returns inf until two chunks are in.
+        """
+        acc, sq = (self._fft_acc, self._fft_sq) if key == "fft" else (self._env_acc, self._env_sq)
+        if acc is None or sq is None or self.count < 2:
+            return float("inf")
+        n = self.count
+        mean = acc / n
+        var = np.maximum(sq / n - mean**2, 0.0) * n / (n - 1)
+        if max_hz is not None:
+            stop = int(max_hz * self.N / self.sr) + 1
+            mean, var = mean[:stop], var[:stop]
+        norm = float(np.sum(mean**2))
+        if norm <= 0:
+            return float("inf")
+        return float(np.sqrt(np.sum(var / n) / norm))
+
+    def result(self):
+        """
+        Returns {"fft": (freqs, mag) or None, "env": (freqs, mag) or None,
+                 "bands": [(freqs, mag), ...] (empty if no bands)}.
+        """
+        out = {"fft": None, "env": None, "bands": []}
+        if self.count == 0:
+            empty = (np.array([]), np.array([]))
+            out["fft"] = empty if self.do_fft else None
+            out["env"] = empty if self.do_env else None
+            out["bands"] = [empty for _ in self.bands]
+            return out
+        freqs = rfftfreq_hz(self.N, self.sr)
+        if self.do_fft:
+            out["fft"] = (freqs, rms_normalize(self._fft_acc / self.count))
+        if self.do_env:
+            out["env"] = (freqs, rms_normalize(self._env_acc / self.count))
+        for acc, (M, env_sr) in zip(self._band_accs, self._band_axes):
+            out["bands"].append((rfftfreq_hz(M, env_sr), rms_normalize(acc / self.count)))
+        return out
+
+class InstanceSpectra:
+    """
+    Per-instance SpectralAccumulators fed chunk by chunk.
+
+    Chunks are filtered one at a time: any chunk whose SR or length differs
+    from the first chunk ever added is skipped, and the rest of its instance
+    is still used. This is looser than load_session, which drops a whole
+    instance with mixed chunks and keys on the first consistent instance, so
+    results can differ from it on inconsistent recordings.
+    """
+
+    def __init__(self, do_fft=True, do_env=True, track_spread=False):
+        self.do_fft = do_fft
+        self.do_env = do_env
+        self.track_spread = track_spread
+        self.samplerate = None
+        self.N = None
+        self.instances = []
+        self.accumulators = {}
+
+    def add_chunk(self, label, x: np.ndarray, sr) -> bool:
+        """
+        Fold one chunk into its instance. Returns False if it was rejected.
+        """
+        if self.samplerate is None:
+            self.samplerate, self.N = sr, len(x)
+        elif sr != self.samplerate or len(x) != self.N:
+            return False
+        if label not in self.accumulators:
+            self.accumulators[label] = SpectralAccumulator(
+                sr, do_fft=self.do_fft, do_env=self.do_env, track_spread=self.track_spread
+            )
+            self.instances.append(label)
+        self.accumulators[label].add(x)
+        return True
+
+    def chunk_counts(self):
+        return {lbl: self.accumulators[lbl].count for lbl in self.instances}
+
+    def curves(self):
+        """
+        Current averaged spectra as {"fft": [(label, f, y), ...], "env": [...]}.
+        """
+        out = {"fft": [], "env": []}
+        for lbl in self.instances:
+            res = self.accumulators[lbl].result()
+            if self.do_fft:
+                out["fft"].append((lbl, *res["fft"]))
+            if self.do_env:
+                out["env"].append((lbl, *res["env"]))
+        return out
+
+def compute_features(chunks, sr, do_fft=True, do_env=True, time_seconds=None, bands=None):
+    """
+    Compute every requested feature in a single pass over the chunks.
+
+    Same results as calling avg_fft / avg_envelope_fft / avg_band_envelope_fft /
+    concat_first_seconds separately, but each chunk is visited once.
+
+    Returns:
+      {
+        "fft":   (freqs, mag) or None,
+        "env":   (freqs, mag) or None,
+        "bands": [(freqs, mag), ...] (one per band, empty if bands is None),
+        "time":  np.ndarray or None
+      }
+    """
+    acc = SpectralAccumulator(sr, do_fft=do_fft, do_env=do_env, bands=bands)
+    if do_fft or do_env or bands:
+        for x in chunks:
+            acc.add(x)
+
+    out = acc.result()
+    out["time"] = None
+    if time_seconds is not None:
+        out["time"] = concat_first_seconds(chunks, sr, time_seconds)
+    return out
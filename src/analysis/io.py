@@ -84,6 +84,26 @@ def get_instance_paths_from_selection(selection_path: str) -> List[Tuple[str, st
     label = os.path.basename(selection_path) or "instance"
     return [(label, selection_path)]
 
+def list_chunk_files(chunks_dir: str) -> List[str]:
+    """
+    Sorted WAV filenames in a chunks folder (recorder names sort chronologically).
+    """
+    return sorted(f for f in os.listdir(chunks_dir) if f.lower().endswith(".wav"))
+
+def read_chunk(file_path: str, expect_seconds: float = 1.0) -> Tuple[np.ndarray, int] | None:
+    """
+    Read one chunk as mono float32. Returns (signal_1d, sr), or None if the file
+    can't be read or its length doesn't match expect_seconds.
+    """
+    try:
+        data, sr = sf.read(file_path, dtype="float32", always_2d=False)
+    except Exception:
+        return None
+    x = to_mono(np.asarray(data))
+    if sr > 0 and len(x) > 0 and abs(len(x) / sr - expect_seconds) <= 1e-3:
+        return x, sr
+    return None
+
 def load_chunks(instance_or_chunks_path: str, expect_seconds: float = 1.0) -> List[Tuple[np.ndarray, int]]:
     """
     Loads 1-second WAV chunks, accepting either an instance path with a 'chunks' subfolder,
@@ -94,15 +114,9 @@ def load_chunks(instance_or_chunks_path: str, expect_seconds: float = 1.0) -> Li
     if not chunks_dir or not os.path.isdir(chunks_dir):
         return []
 
-    wav_files = sorted([f for f in os.listdir(chunks_dir) if f.lower().endswith(".wav")])
     results: List[Tuple[np.ndarray, int]] = []
-    for f in wav_files:
-        file_path = os.path.join(chunks_dir, f)
-        try:
-            data, sr = sf.read(file_path, dtype="float32", always_2d=False)
-        except Exception:
-            continue
-        x = to_mono(np.asarray(data))
-        if sr > 0 and len(x) > 0 and abs(len(x) / sr - expect_seconds) <= 1e-3:
-            results.append((x, sr))
-    return results
\ No newline at end of file
+    for f in list_chunk_files(chunks_dir):
+        pair = read_chunk(os.path.join(chunks_dir, f), expect_seconds=expect_seconds)
+        if pair is not None:
+            results.append(pair)
+    return results
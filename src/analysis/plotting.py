@@ -2,19 +2,26 @@ from __future__ import annotations
 import os
 import numpy as np
 from matplotlib import pyplot as plt
-from matplotlib.widgets import CheckButtons
-from typing import Optional
-from .features import avg_fft, avg_envelope_fft, concat_time
-from .dsp import rms_normalize          # NEW: we use rms_normalize here
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Sequence
+from .features import (
+    avg_fft, avg_envelope_fft, avg_band_envelope_fft, concat_first_seconds, compute_features,
+    DEFAULT_DEMOD_BANDS,
+)
 
 def _add_checkboxes(fig, ax, lines, labels, panel_rect=(0.80, 0.20, 0.18, 0.60)):
     """
     Robust checkbox panel:
-      - dict mapping (label -> line)
+      - dict mapping (label -> line, or list of lines across subplots)
       - draw_idle() for refresh
       - keep a reference to avoid GC
       - avoid tight_layout after adding panel
     """
+    from matplotlib.widgets import CheckButtons  # interactive only
+
     fig.subplots_adjust(right=min(0.78, 1 - panel_rect[2] - 0.02))
 
     mapping = {}
@@ -28,14 +35,15 @@ def _add_checkboxes(fig, ax, lines, labels, panel_rect=(0.80, 0.20, 0.18, 0.60))
     rax.set_title("Show/Hide", fontsize=10)
     rax.set_facecolor((0.96, 0.96, 0.96))
 
-    states = [ln.get_visible() for ln in lines]
+    states = [(ln[0] if isinstance(ln, list) else ln).get_visible() for ln in lines]
     checks = CheckButtons(rax, safe_labels, states)
 
     def on_click(label):
         ln = mapping.get(label)
         if ln is None:
             return
-        ln.set_visible(not ln.get_visible())
+        for l in (ln if isinstance(ln, list) else [ln]):
+            l.set_visible(not l.get_visible())
         fig.canvas.draw_idle()
 
     checks.on_clicked(on_click)
@@ -57,6 +65,74 @@ def _save_or_show(fig, save_dir: Optional[str], filename: str, file_format: str)
     else:
         plt.show()
 
+def draw_spectrum(ax, curves, xlim_hz: float, title: str):
+    """
+    Draw averaged spectra on an existing axes (used by the live watch/preview
+    figures as well as the plots here).
+    curves: list of (label, freqs, mag). Returns (lines, labels).
+    """
+    lines, labels = [], []
+    for lbl, f, y in curves:
+        line, = ax.plot(f, y, label=lbl, linewidth=1.0)
+        lines.append(line); labels.append(lbl)
+
+    ax.set_xlim(0, xlim_hz)
+    ax.set_title(title)
+    ax.set_xlabel("Frequency (Hz)")
+    ax.set_ylabel("Magnitude")
+    ax.grid(True, alpha=0.25)
+    return lines, labels
+
+def _decimate_for_plot(y: np.ndarray, sr, target_points: int = 20000):
+    """
+    Decimate for plotting so UI remains responsive. Returns (t, y_plot).
+    """
+    step = max(1, y.size // target_points)
+    y_plot = y[::step]
+    t = (np.arange(y_plot.size, dtype=np.float64) * step) / sr
+    return t, y_plot
+
+def _draw_time(ax, curves, max_seconds: float):
+    """
+    curves: list of (label, t, y) already decimated. Returns (lines, labels).
+    """
+    lines, labels = [], []
+    for lbl, t, y in curves:
+        line, = ax.plot(t, y, label=lbl, linewidth=0.9)
+        lines.append(line); labels.append(lbl)
+
+    ax.set_title(f"Concatenated Time Domain (first {max_seconds}s, normalized)")
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Amplitude")
+    ax.grid(True, alpha=0.25)
+    return lines, labels
+
+def _draw_bands(axes, bands, band_curves, xlim_hz: float):
+    """
+    One subplot per demodulation band, sharing instance labels.
+    band_curves: per band, a list of (label, freqs, mag).
+    Returns (lines, labels) where each entry of lines is the list of that
+    instance's lines across all subplots.
+    """
+    by_label = {}
+    for ax, (lo, hi), curves in zip(axes, bands, band_curves):
+        for lbl, f, y in curves:
+            line, = ax.plot(f, y, label=lbl, linewidth=1.0)
+            by_label.setdefault(lbl, []).append(line)
+        ax.set_xlim(0, xlim_hz)
+        ax.set_title(f"{lo / 1000:g}-{hi / 1000:g} kHz")
+        ax.set_xlabel("Frequency (Hz)")
+        ax.grid(True, alpha=0.25)
+    axes[0].set_ylabel("Magnitude")
+    return list(by_label.values()), list(by_label.keys())
+
+def _band_figure(n_bands: int, offscreen: bool = False):
+    figsize = (max(12, 4 * n_bands), 5)
+    fig = _offscreen_figure(figsize) if offscreen else plt.figure(figsize=figsize)
+    axes = fig.subplots(1, n_bands, sharey=True, squeeze=False)
+    fig.suptitle("Band Envelope FFT (RMS-normalized)")
+    return fig, list(axes[0])
+
 def plot_avg_fft(
     results,
     xlim_hz: float = 3000,
@@ -70,18 +146,13 @@ def plot_avg_fft(
         print("Nothing to plot (FFT).")
         return
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    lines, labels = [], []
+    curves = []
     for lbl in instances:
         f, y = avg_fft(results["chunks"][lbl], sr)
-        line, = ax.plot(f, y, label=lbl, linewidth=1.0)
-        lines.append(line); labels.append(lbl)
+        curves.append((lbl, f, y))
 
-    ax.set_xlim(0, xlim_hz)
-    ax.set_title("Average FFT (RMS-normalized)")
-    ax.set_xlabel("Frequency (Hz)")
-    ax.set_ylabel("Magnitude")
-    ax.grid(True, alpha=0.25)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    lines, labels = draw_spectrum(ax, curves, xlim_hz, "Average FFT (RMS-normalized)")
 
     if save_dir is None:  # only interactive
         _add_checkboxes(fig, ax, lines, labels)
@@ -101,57 +172,19 @@ def plot_avg_envelope_fft(
         print("Nothing to plot (Envelope FFT).")
         return
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    lines, labels = [], []
+    curves = []
     for lbl in instances:
         f, y = avg_envelope_fft(results["chunks"][lbl], sr)
-        line, = ax.plot(f, y, label=lbl, linewidth=1.0)
-        lines.append(line); labels.append(lbl)
+        curves.append((lbl, f, y))
 
-    ax.set_xlim(0, xlim_hz)
-    ax.set_title("Envelope FFT (RMS-normalized)")
-    ax.set_xlabel("Frequency (Hz)")
-    ax.set_ylabel("Magnitude")
-    ax.grid(True, alpha=0.25)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    lines, labels = draw_spectrum(ax, curves, xlim_hz, "Envelope FFT (RMS-normalized)")
 
     if save_dir is None:
         _add_checkboxes(fig, ax, lines, labels)
 
     _save_or_show(fig, save_dir, filename, file_format)
 
-
-def _concat_first_seconds(chunks, sr, max_seconds: float) -> np.ndarray:
-    """
-    Concatenate only up to 'max_seconds' of audio from the list of chunks.
-    This avoids allocating the full recording if it's long.
-    """
-    if not chunks:
-        return np.array([])
-    if not max_seconds or max_seconds <= 0:
-        # Fallback: full concat (not ideal for huge sets)
-        y = np.concatenate(chunks)
-        return rms_normalize(y)
-
-    max_samples = int(sr * max_seconds)
-    if max_samples <= 0:
-        return np.array([])
-
-    buf = []
-    count = 0
-    for x in chunks:
-        remain = max_samples - count
-        if remain <= 0:
-            break
-        take = min(len(x), remain)
-        buf.append(x[:take])
-        count += take
-
-    if not buf:
-        return np.array([])
-
-    y = np.concatenate(buf)
-    return rms_normalize(y)
-
 def plot_concat_time_domain(
     results,
     max_seconds: float = 10.0,
@@ -165,29 +198,189 @@ def plot_concat_time_domain(
         print("Nothing to plot (Time Domain).")
         return
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    lines, labels = [], []
+    curves = []
     for lbl in instances:
         # Concatenate only up to the target seconds to avoid big allocations
-        y = _concat_first_seconds(results["chunks"][lbl], sr, max_seconds)
+        y = concat_first_seconds(results["chunks"][lbl], sr, max_seconds)
         if y.size == 0:
             continue
+        t, y_plot = _decimate_for_plot(y, sr)
+        curves.append((lbl, t, y_plot))
 
-        # Decimate for plotting so UI remains responsive
-        target_points = 20000
-        step = max(1, y.size // target_points)
-        y_plot = y[::step]
-        t = (np.arange(y_plot.size, dtype=np.float64) * step) / sr
+    fig, ax = plt.subplots(figsize=(12, 6))
+    lines, labels = _draw_time(ax, curves, max_seconds)
 
-        line, = ax.plot(t, y_plot, label=lbl, linewidth=0.9)
-        lines.append(line); labels.append(lbl)
+    if save_dir is None:
+        _add_checkboxes(fig, ax, lines, labels)
 
-    ax.set_title(f"Concatenated Time Domain (first {max_seconds}s, normalized)")
-    ax.set_xlabel("Time (s)")
-    ax.set_ylabel("Amplitude")
-    ax.grid(True, alpha=0.25)
+    _save_or_show(fig, save_dir, filename, file_format)
+
+
+def plot_band_envelope_fft(
+    results,
+    bands=DEFAULT_DEMOD_BANDS,
+    xlim_hz: float = 500,
+    save_dir: Optional[str] = None,
+    filename: str = "band_envelope_fft.svg",
+    file_format: str = "svg",
+):
+    """
+    Envelope spectrum per demodulation band, bands side by side.
+    """
+    instances = results["instances"]
+    sr = results["samplerate"]
+    if not instances or not sr or not bands:
+        print("Nothing to plot (Band Envelope FFT).")
+        return
+
+    band_curves = [[] for _ in bands]
+    for lbl in instances:
+        for i, (f, y) in enumerate(avg_band_envelope_fft(results["chunks"][lbl], sr, bands)):
+            band_curves[i].append((lbl, f, y))
+
+    fig, axes = _band_figure(len(bands))
+    lines, labels = _draw_bands(axes, bands, band_curves, xlim_hz)
 
     if save_dir is None:
-        _add_checkboxes(fig, ax, lines, labels)
+        _add_checkboxes(fig, axes[-1], lines, labels)
 
     _save_or_show(fig, save_dir, filename, file_format)
+
+
+# --- Off-screen batch rendering ---
+
+SAVE_FORMATS = ("svg", "png", "pdf")
+
+def _offscreen_figure(figsize) -> Figure:
+    # Agg canvas attached directly: independent of the session's pyplot backend
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _render_job(job) -> list:
+    """
+    Draw one figure from precomputed curves and save it in every requested format.
+    Runs in a worker process or in-process, so it only takes plain data and
+    never touches pyplot. Returns the list of saved paths.
+    """
+    if job["kind"] == "bands":
+        fig, axes = _band_figure(len(job["bands"]), offscreen=True)
+        _draw_bands(axes, job["bands"], job["curves"], job["xlim_hz"])
+    else:
+        fig = _offscreen_figure((12, 6))
+        ax = fig.subplots()
+        if job["kind"] == "time":
+            _draw_time(ax, job["curves"], job["max_seconds"])
+        else:
+            draw_spectrum(ax, job["curves"], job["xlim_hz"], job["title"])
+
+    os.makedirs(job["save_dir"], exist_ok=True)
+    paths = []
+    for fmt in job["formats"]:
+        path = os.path.join(job["save_dir"], f"{job['basename']}.{fmt}")
+        fig.savefig(path, dpi=150, bbox_inches="tight", format=fmt)
+        paths.append(path)
+    return paths
+
+def save_spectrum_figure(curves, xlim_hz: float, title: str, save_dir: str,
+                         basename: str, formats: Sequence[str] = ("svg",)) -> list:
+    """
+    Save one spectrum figure off-screen as <basename>.<fmt> for each format.
+    curves: list of (label, freqs, mag). Returns the saved paths.
+    """
+    return _render_job({
+        "kind": "spectrum", "basename": basename, "curves": curves,
+        "xlim_hz": xlim_hz, "title": title,
+        "save_dir": save_dir, "formats": list(formats),
+    })
+
+def render_saved_plots(
+    results,
+    save_dir: str,
+    do_fft: bool = True,
+    do_env: bool = True,
+    do_time: bool = True,
+    formats: Sequence[str] = ("svg",),
+    fft_xlim_hz: float = 3000,
+    env_xlim_hz: float = 1000,
+    max_seconds: float = 10.0,
+    bands=None,
+    bands_xlim_hz: float = 500,
+    workers: Optional[int] = None,
+):
+    """
+    Save the selected figures without displaying them.
+
+    All requested features are computed in one pass over each instance's chunks,
+    then each figure is drawn and saved on the Agg backend in its own worker
+    process, so total time is roughly that of the slowest figure.
+    bands (list of (lo, hi) Hz) adds the side-by-side band envelope figure.
+    workers=1 renders in this process instead.
+    """
+    instances = results.get("instances", [])
+    sr = results.get("samplerate", None)
+    if not instances or not sr:
+        print("Nothing to plot.")
+        return []
+
+    formats = [f.lower() for f in formats if f]
+    unknown = [f for f in formats if f not in SAVE_FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported format(s): {unknown}; expected one of {SAVE_FORMATS}")
+    if not formats:
+        return []
+
+    bands = list(bands) if bands else []
+    fft_curves, env_curves, time_curves = [], [], []
+    band_curves = [[] for _ in bands]
+    for lbl in instances:
+        feats = compute_features(
+            results["chunks"][lbl], sr,
+            do_fft=do_fft, do_env=do_env,
+            time_seconds=max_seconds if do_time else None,
+            bands=bands,
+        )
+        for i, (f, y) in enumerate(feats["bands"]):
+            band_curves[i].append((lbl, f, y))
+        if do_fft:
+            fft_curves.append((lbl, *feats["fft"]))
+        if do_env:
+            env_curves.append((lbl, *feats["env"]))
+        if do_time and feats["time"].size > 0:
+            time_curves.append((lbl, *_decimate_for_plot(feats["time"], sr)))
+
+    base = {"save_dir": save_dir, "formats": formats}
+    jobs = []
+    if do_fft:
+        jobs.append({**base, "kind": "spectrum", "basename": "avg_fft", "curves": fft_curves,
+                     "xlim_hz": fft_xlim_hz, "title": "Average FFT (RMS-normalized)"})
+    if do_env:
+        jobs.append({**base, "kind": "spectrum", "basename": "avg_envelope_fft", "curves": env_curves,
+                     "xlim_hz": env_xlim_hz, "title": "Envelope FFT (RMS-normalized)"})
+    if do_time:
+        jobs.append({**base, "kind": "time", "basename": "concat_time", "curves": time_curves,
+                     "max_seconds": max_seconds})
+    if bands:
+        jobs.append({**base, "kind": "bands", "basename": "band_envelope_fft", "curves": band_curves,
+                     "bands": bands, "xlim_hz": bands_xlim_hz})
+    if not jobs:
+        return []
+
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+
+    saved = None
+    if workers > 1 and len(jobs) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                saved = [p for paths in pool.map(_render_job, jobs) for p in paths]
+        except (OSError, BrokenProcessPool) as e:
+            print(f"Parallel rendering unavailable ({e}); rendering sequentially.")
+            saved = None
+
+    if saved is None:
+        saved = [p for job in jobs for p in _render_job(job)]
+
+    for path in saved:
+        print(f"Saved: {path}")
+    return saved
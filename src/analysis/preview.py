@@ -0,0 +1,189 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from matplotlib import pyplot as plt
+from .io import get_instance_paths_from_selection, resolve_chunks_dir, list_chunk_files, read_chunk
+from .features import InstanceSpectra
+from .plotting import draw_spectrum
+
+def stratified_order(n: int) -> List[int]:
+    """
+    All indices 0..n-1, ordered so that every prefix is spread evenly in time
+    (van der Corput sequence): 0, n/2, n/4, 3n/4, ...
+    """
+    order: List[int] = []
+    seen = set()
+    k = 0
+    while len(order) < n:
+        v, denom, i = 0.0, 1.0, k
+        while i:
+            denom *= 2
+            v += (i & 1) / denom
+            i >>= 1
+        idx = int(v * n)
+        if idx not in seen:
+            seen.add(idx)
+            order.append(idx)
+        k += 1
+    return order
+
+class ProgressiveAverager(InstanceSpectra):
+    """
+    Averaged spectra of a selection, built from chunks taken in stratified order.
+
+    step() reads a few more chunks per instance, so the running averages are an
+    unbiased preview early on and cover every chunk once all have been read.
+    The SR/length filter is per chunk and keyed on the first chunk in
+    stratified order (see InstanceSpectra), so on inconsistent recordings the
+    result can differ from load_session. Thread-safe: a background thread can call
+    step() while the UI reads curves().
+    """
+
+    def __init__(self, selection_path: str, expect_seconds: float = 1.0,
+                 do_fft: bool = True, do_env: bool = False):
+        super().__init__(do_fft=do_fft, do_env=do_env, track_spread=True)
+        self.expect_seconds = expect_seconds
+        self.total_chunks = 0
+        self.lock = threading.Lock()
+
+        # label -> list of chunk paths in stratified order, and how far we got
+        self._queue: Dict[str, List[str]] = {}
+        self._pos: Dict[str, int] = {}
+        for label, inst_path in get_instance_paths_from_selection(selection_path):
+            chunks_dir = resolve_chunks_dir(inst_path)
+            if not chunks_dir:
+                continue
+            files = list_chunk_files(chunks_dir)
+            if not files:
+                continue
+            self._queue[label] = [os.path.join(chunks_dir, files[i]) for i in stratified_order(len(files))]
+            self._pos[label] = 0
+            self.total_chunks += len(files)
+
+    @property
+    def done(self) -> bool:
+        return all(self._pos[lbl] >= len(q) for lbl, q in self._queue.items())
+
+    @property
+    def processed(self) -> int:
+        return sum(self._pos.values())
+
+    def step(self, per_instance: int) -> int:
+        """
+        Read up to per_instance more chunks from every instance. Returns how many were read.
+        """
+        read = 0
+        for label, queue in self._queue.items():
+            start = self._pos[label]
+            for path in queue[start:start + per_instance]:
+                # Decode outside the lock; only the fold-in is guarded
+                pair = read_chunk(path, expect_seconds=self.expect_seconds)
+                with self.lock:
+                    self._pos[label] += 1
+                    if pair is not None:
+                        self.add_chunk(label, *pair)
+                read += 1
+        return read
+
+    def rel_sem(self, max_hz=None) -> float:
+        """
+        Worst relative standard error over instances (see SpectralAccumulator.rel_sem).
+        """
+        key = "fft" if self.do_fft else "env"
+        with self.lock:
+            if not self.accumulators:
+                return float("inf")
+            return max(acc.rel_sem(key, max_hz) for acc in self.accumulators.values())
+
+    def curves(self) -> Dict[str, List[tuple]]:
+        with self.lock:
+            return super().curves()
+
+def preview_avg_fft(
+    selection_path: str,
+    do_fft: bool = True,
+    do_env: bool = False,
+    fft_xlim_hz: float = 3000,
+    env_xlim_hz: float = 1000,
+    initial_per_instance: int = 8,
+    batch_per_instance: int = 8,
+    target_rel_sem: Optional[float] = 0.05,
+    time_budget_s: Optional[float] = None,
+    refresh_s: float = 0.5,
+) -> ProgressiveAverager:
+    """
+    Show averaged spectra from a small stratified sample straight away, then
+    keep refining them in a background thread.
+
+    Refinement stops when every chunk has been read, when the worst relative
+    standard error (within the plotted range) drops to target_rel_sem, after
+    time_budget_s seconds, or when the window is closed. The figure then stays
+    open as a normal interactive plot.
+    """
+    prog = ProgressiveAverager(selection_path, do_fft=do_fft, do_env=do_env)
+    panels = []
+    if do_fft:
+        panels.append(("fft", fft_xlim_hz, "Average FFT (RMS-normalized)"))
+    if do_env:
+        panels.append(("env", env_xlim_hz, "Envelope FFT (RMS-normalized)"))
+    if not panels or prog.total_chunks == 0:
+        print("Nothing to preview.")
+        return prog
+
+    sem_xlim = fft_xlim_hz if do_fft else env_xlim_hz
+    t0 = time.monotonic()
+    prog.step(initial_per_instance)
+    if not prog.instances:
+        print("No valid audio found in the sampled chunks.")
+        return prog
+
+    plt.ion()
+    fig, axes = plt.subplots(len(panels), 1, figsize=(12, 4 * len(panels)), squeeze=False)
+    axes = [ax for (ax,) in axes]
+
+    def redraw(status: str):
+        curves = prog.curves()
+        for ax, (key, xlim_hz, title) in zip(axes, panels):
+            ax.clear()
+            draw_spectrum(ax, curves[key], xlim_hz, title)
+            ax.legend(loc="upper right", fontsize=8)
+        fig.suptitle(status, fontsize=10)
+        fig.canvas.draw_idle()
+
+    def status_text(state: str) -> str:
+        sem = prog.rel_sem(sem_xlim)
+        sem_txt = f"±{100 * sem:.1f}%" if sem != float("inf") else "n/a"
+        return f"{state}: {prog.processed}/{prog.total_chunks} chunks, rel. error {sem_txt}"
+
+    stop = threading.Event()
+
+    def refine():
+        while not stop.is_set() and not prog.done:
+            if target_rel_sem is not None and prog.rel_sem(sem_xlim) <= target_rel_sem:
+                break
+            if time_budget_s is not None and time.monotonic() - t0 >= time_budget_s:
+                break
+            prog.step(batch_per_instance)
+
+    redraw(status_text("Preview"))
+    worker = threading.Thread(target=refine, name="preview-refine", daemon=True)
+    worker.start()
+
+    while worker.is_alive():
+        plt.pause(refresh_s)
+        if not plt.fignum_exists(fig.number):
+            stop.set()
+            break
+        redraw(status_text("Refining"))
+    worker.join()
+
+    if plt.fignum_exists(fig.number):
+        redraw(status_text("Done" if prog.done else "Stopped"))
+        plt.ioff()
+        plt.show()
+    else:
+        plt.ioff()
+    print(status_text("Preview finished"))
+    return prog
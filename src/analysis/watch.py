@@ -0,0 +1,180 @@
+from __future__ import annotations
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+from matplotlib import pyplot as plt
+from .io import get_instance_paths_from_selection, resolve_chunks_dir, list_chunk_files, read_chunk
+from .features import InstanceSpectra
+from .plotting import draw_spectrum, save_spectrum_figure
+
+# Directory mtimes younger than this are not trusted for skipping a re-list
+# (coarse filesystem timestamps could hide a file written in the same tick)
+MTIME_SETTLE_NS = 2_000_000_000
+
+# A chunk that still fails to read after this many polls is treated as bad, not in-progress
+MAX_READ_ATTEMPTS = 3
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class SessionWatcher(InstanceSpectra):
+    """
+    Follows a session / instance / chunks folder while it is being recorded.
+
+    Each poll() reads only chunk files that weren't seen before and folds them
+    into a per-instance SpectralAccumulator, so the cost of an update scales with
+    the number of new chunks. Folders whose mtime hasn't changed are not re-listed.
+
+    Only chunks matching the SR and length of the first accepted chunk are
+    used; the filter is per chunk, not per instance (see InstanceSpectra).
+    """
+
+    def __init__(self, selection_path: str, expect_seconds: float = 1.0,
+                 do_fft: bool = True, do_env: bool = True):
+        super().__init__(do_fft=do_fft, do_env=do_env)
+        self.selection_path = os.path.abspath(selection_path)
+        self.expect_seconds = expect_seconds
+
+        # All per-folder state is keyed by the resolved chunks directory, so the
+        # same folder can't be picked up twice under different labels
+        self._labels: Dict[str, str] = {}
+        self._selection_mtime = None
+        self._dir_mtime: Dict[str, Optional[int]] = {}
+        self._seen: Dict[str, set] = {}
+        self._pending: Dict[str, Dict[str, int]] = {}
+
+    def _refresh_instances(self) -> None:
+        mtime = _mtime_ns(self.selection_path)
+        settled = mtime is not None and time.time_ns() - mtime > MTIME_SETTLE_NS
+        if settled and mtime == self._selection_mtime:
+            return
+        self._selection_mtime = mtime
+        for label, inst_path in get_instance_paths_from_selection(self.selection_path):
+            chunks_dir = resolve_chunks_dir(inst_path)
+            if not chunks_dir:
+                # Nothing recorded there yet (e.g. empty chunks folder or a session
+                # without instances); resolve again on a later poll
+                continue
+            chunks_dir = os.path.realpath(chunks_dir)
+            if chunks_dir not in self._labels:
+                self._labels[chunks_dir] = label
+                self._seen[chunks_dir] = set()
+                self._pending[chunks_dir] = {}
+
+    def _poll_instance(self, chunks_dir: str) -> int:
+        label = self._labels[chunks_dir]
+        pending = self._pending[chunks_dir]
+        mtime = _mtime_ns(chunks_dir)
+        if mtime is None:
+            return 0
+        settled = time.time_ns() - mtime > MTIME_SETTLE_NS
+        if mtime == self._dir_mtime.get(chunks_dir) and settled and not pending:
+            return 0
+        self._dir_mtime[chunks_dir] = mtime
+
+        seen = self._seen[chunks_dir]
+        added = 0
+        for f in list_chunk_files(chunks_dir):
+            if f in seen:
+                continue
+            pair = read_chunk(os.path.join(chunks_dir, f), expect_seconds=self.expect_seconds)
+            if pair is None:
+                # Possibly still being written; retry on the next polls before giving up
+                pending[f] = pending.get(f, 0) + 1
+                if pending[f] >= MAX_READ_ATTEMPTS:
+                    seen.add(f)
+                    pending.pop(f, None)
+                continue
+            seen.add(f)
+            pending.pop(f, None)
+            if self.add_chunk(label, *pair):
+                added += 1
+        return added
+
+    def poll(self) -> int:
+        """
+        Pick up newly written chunks. Returns how many were added.
+        """
+        self._refresh_instances()
+        return sum(self._poll_instance(chunks_dir) for chunks_dir in list(self._labels))
+
+def watch_session(
+    selection_path: str,
+    interval_s: float = 2.0,
+    do_fft: bool = True,
+    do_env: bool = True,
+    fft_xlim_hz: float = 3000,
+    env_xlim_hz: float = 1000,
+    save_dir: Optional[str] = None,
+    formats: Sequence[str] = ("svg",),
+    idle_stop_s: Optional[float] = None,
+    on_update: Optional[Callable[[SessionWatcher, int], Any]] = None,
+) -> SessionWatcher:
+    """
+    Incrementally analyse a folder while it is being recorded.
+
+    Every interval_s the folder is polled for new chunks. If any arrived:
+      - interactive (save_dir=None): the live FFT / envelope figures are redrawn
+      - save_dir given: the figures are re-saved there (overwritten in place)
+
+    Stops when the live window is closed, on Ctrl+C, or after idle_stop_s
+    seconds without new chunks (e.g. the recording has ended).
+    """
+    watcher = SessionWatcher(selection_path, do_fft=do_fft, do_env=do_env)
+    panels = []
+    if do_fft:
+        panels.append(("fft", "avg_fft", fft_xlim_hz, "Average FFT (RMS-normalized)"))
+    if do_env:
+        panels.append(("env", "avg_envelope_fft", env_xlim_hz, "Envelope FFT (RMS-normalized)"))
+    if not panels:
+        print("Nothing to watch (no features selected).")
+        return watcher
+
+    live_axes = None
+    if save_dir is None:
+        plt.ion()
+        fig, axes = plt.subplots(len(panels), 1, figsize=(12, 4 * len(panels)), squeeze=False)
+        live_axes = [ax for (ax,) in axes]
+        fig.show()
+
+    print(f"👀 Watching {watcher.selection_path} (every {interval_s}s). Press Ctrl+C to stop.")
+    last_new = time.monotonic()
+    try:
+        while True:
+            added = watcher.poll()
+            now = time.monotonic()
+            if added:
+                last_new = now
+                curves = watcher.curves()
+                total = sum(watcher.chunk_counts().values())
+                if live_axes is not None:
+                    for ax, (key, _, xlim_hz, title) in zip(live_axes, panels):
+                        ax.clear()
+                        draw_spectrum(ax, curves[key], xlim_hz, f"{title} - {total} chunks")
+                        ax.legend(loc="upper right", fontsize=8)
+                    fig.canvas.draw_idle()
+                else:
+                    for key, basename, xlim_hz, title in panels:
+                        save_spectrum_figure(curves[key], xlim_hz, title, save_dir, basename, formats)
+                print(f"🔄 +{added} chunks ({total} total)")
+                if on_update is not None:
+                    on_update(watcher, added)
+            elif idle_stop_s is not None and now - last_new >= idle_stop_s:
+                print(f"No new chunks for {idle_stop_s}s; stopping watch.")
+                break
+
+            if live_axes is not None:
+                if not plt.fignum_exists(fig.number):
+                    break
+                plt.pause(interval_s)
+            else:
+                time.sleep(interval_s)
+    except KeyboardInterrupt:
+        print("🛑 Watch stopped.")
+
+    if live_axes is not None:
+        plt.ioff()
+    return watcher
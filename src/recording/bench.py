@@ -0,0 +1,76 @@
+import tempfile
+import time
+import soundfile as sf
+from .recorder import record_chunks, SAMPLERATE, CHANNELS, DTYPE, CHUNK_SAMPLES
+from .sources import ReplaySource, synthetic_signal
+
+# Headless benchmarking of the recording path (callback -> queue -> sf.write)
+# without audio hardware or a keyboard listener.
+
+def stop_after_blocks(n):
+    return lambda stats: stats["blocks_written"] >= n
+
+def stop_after_seconds(seconds):
+    # Clock starts on the first check, i.e. when recording starts
+    t_end = [None]
+
+    def check(stats):
+        if t_end[0] is None:
+            t_end[0] = time.monotonic() + seconds
+        return time.monotonic() >= t_end[0]
+
+    return check
+
+def stalling_writer(stall_s, every_n=10, writer=sf.write):
+    """
+    Wrap a writer so every `every_n`-th write sleeps `stall_s` first,
+    to see how the queue copes with a slow or stalled disk.
+    """
+    count = [0]
+
+    def write(*args, **kwargs):
+        count[0] += 1
+        if every_n and count[0] % every_n == 0:
+            time.sleep(stall_s)
+        return writer(*args, **kwargs)
+
+    return write
+
+def benchmark_recorder(source=None, out_dir=None, stop_condition=None,
+                       max_queue_blocks=None, writer=sf.write, verbose=False):
+    """
+    Run the recording loop against a replay source and return its stats.
+
+    Defaults: 30 s of synthetic noise at the recorder's settings, replayed as
+    fast as possible into a temporary folder. Leave max_queue_blocks unset for
+    unpaced sources; drops are only meaningful against a paced source.
+    """
+    if source is None:
+        source = ReplaySource(lambda: synthetic_signal(SAMPLERATE, 30), SAMPLERATE, channels=CHANNELS,
+                              dtype=DTYPE, blocksize=CHUNK_SAMPLES, speed=None)
+    if out_dir is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            return benchmark_recorder(source, tmp, stop_condition, max_queue_blocks, writer, verbose)
+
+    _, stats = record_chunks(source, out_dir, source.samplerate,
+                             stop_condition=stop_condition,
+                             max_queue_blocks=max_queue_blocks,
+                             writer=writer, verbose=verbose)
+    return stats
+
+def print_stats(stats):
+    print(f"Blocks written:    {stats['blocks_written']} ({stats['audio_seconds']:.1f} s audio)")
+    print(f"Wall time:         {stats['wall_seconds']:.2f} s")
+    print(f"Throughput:        {stats['realtime_factor']:.1f}x real time, {stats['mb_per_s']:.1f} MB/s")
+    print(f"Max queue depth:   {stats['max_queue_depth']}")
+    print(f"Dropped blocks:    {stats['dropped_blocks']}")
+    print(f"Discarded on stop: {stats['discarded_on_stop']}")
+    print(f"Slowest write:     {1000 * stats['max_write_s']:.1f} ms")
+
+if __name__ == "__main__":
+    print("Unpaced replay (max sustainable rate):")
+    print_stats(benchmark_recorder())
+    print("\nReal-time replay with a 3 s disk stall every 5 blocks, queue bounded to 2:")
+    rt = ReplaySource(lambda: synthetic_signal(SAMPLERATE, 15), SAMPLERATE, channels=CHANNELS,
+                      dtype=DTYPE, blocksize=CHUNK_SAMPLES, speed=1.0)
+    print_stats(benchmark_recorder(rt, max_queue_blocks=2, writer=stalling_writer(3.0, every_n=5)))
@@ -1,11 +1,11 @@
-import sounddevice as sd
 import soundfile as sf
 from datetime import datetime
 import os
 import threading
 import queue
-from pynput import keyboard
+import time
 import re
+from .sources import LiveInputSource
 
 def sanitize_folder_name(name):
     # Replace spaces and special characters with underscores
@@ -19,10 +19,101 @@ DTYPE = 'float32'
 SUBTYPE = 'FLOAT'
 CHUNK_SAMPLES = int(SAMPLERATE * CHUNK_DURATION)
 
+def record_chunks(source, chunks_path, samplerate=SAMPLERATE, stop_condition=None,
+                  stop_flag=None, max_queue_blocks=None, writer=sf.write, verbose=True):
+    """
+    Core recording loop: source -> callback -> queue -> one WAV per block.
+
+    source:          LiveInputSource or ReplaySource (see recording.sources)
+    stop_condition:  optional callable(stats) -> bool, checked between blocks
+    stop_flag:       optional [bool] list, e.g. set by the ESC listener
+    max_queue_blocks: bound on queued blocks; when full, new blocks are dropped
+                     and counted (None = unbounded, as for live recording;
+                     only meaningful with a live or paced source)
+    writer:          called as writer(filename, data, samplerate, subtype=...)
+
+    Stops when asked to, or once a replay source is exhausted and the queue is
+    drained. Returns (chunk_metadata, stats).
+    """
+    stop_flag = stop_flag if stop_flag is not None else [False]
+    audio_queue = queue.Queue(maxsize=max_queue_blocks or 0)
+    chunk_metadata = []
+    stats = {
+        "blocks_written": 0,
+        "audio_seconds": 0.0,
+        "wall_seconds": 0.0,
+        "realtime_factor": 0.0,
+        "bytes_written": 0,
+        "mb_per_s": 0.0,
+        "max_queue_depth": 0,
+        "dropped_blocks": 0,
+        "discarded_on_stop": 0,
+        "status_events": 0,
+        "max_write_s": 0.0,
+    }
+
+    # === AUDIO CALLBACK ===
+    def audio_callback(indata, frames, time_info, status):
+        if status:
+            stats["status_events"] += 1
+            if verbose:
+                print(f"⚠️ {status}")
+        try:
+            audio_queue.put_nowait(indata.copy())
+        except queue.Full:
+            stats["dropped_blocks"] += 1
+            return
+        stats["max_queue_depth"] = max(stats["max_queue_depth"], audio_queue.qsize())
+
+    stream = source.open(audio_callback)
+    t0 = time.monotonic()
+    stream.start()
+
+    try:
+        while not stop_flag[0]:
+            if stop_condition is not None and stop_condition(stats):
+                break
+            try:
+                audio_chunk = audio_queue.get(timeout=0.1)
+            except queue.Empty:
+                # The last block may land between the timeout and this check
+                if source.finished and audio_queue.empty():
+                    break
+                continue
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Block index keeps names unique (and sortable) if several land in one second
+            filename = os.path.join(chunks_path, f"chunk_{timestamp}_{stats['blocks_written']:06d}.wav")
+            t_write = time.monotonic()
+            writer(filename, audio_chunk, samplerate, subtype=SUBTYPE)
+            stats["max_write_s"] = max(stats["max_write_s"], time.monotonic() - t_write)
+
+            chunk_metadata.append({
+                "Filename": filename,
+                "Timestamp": timestamp
+            })
+            stats["blocks_written"] += 1
+            stats["audio_seconds"] += len(audio_chunk) / samplerate
+            stats["bytes_written"] += audio_chunk.nbytes
+
+            if verbose:
+                print(f"🎧 Saved chunk: {filename}")
+    finally:
+        stream.stop()
+        stream.close()
+        stats["discarded_on_stop"] = audio_queue.qsize()
+        wall = time.monotonic() - t0
+        stats["wall_seconds"] = wall
+        if wall > 0:
+            stats["realtime_factor"] = stats["audio_seconds"] / wall
+            stats["mb_per_s"] = stats["bytes_written"] / wall / 1e6
+
+    return chunk_metadata, stats
+
 def start_recording_session(session_info):
+    from pynput import keyboard
+
     stop_flag = [False]
-    audio_queue = queue.Queue()
-    chunk_metadata = []
 
     # === SESSION FOLDER SETUP ===
     session_folder_name = sanitize_folder_name(session_info["session_name"])
@@ -43,36 +134,16 @@ def start_recording_session(session_info):
             stop_flag[0] = True
             print("🛑 ESC pressed. Stopping recording...")
 
-    # === AUDIO CALLBACK ===
-    def audio_callback(indata, frames, time, status):
-        if status:
-            print(f"⚠️ {status}")
-        audio_queue.put(indata.copy())
-
     # === RECORDING LOOP ===
+    chunk_metadata = []
+
     def record_loop():
         print("🎙️ Recording started. Press 'esc' to stop.")
-        stream = sd.InputStream(samplerate=SAMPLERATE, channels=CHANNELS,
-                                dtype=DTYPE, callback=audio_callback,
-                                blocksize=CHUNK_SAMPLES)
-        stream.start()
-
+        source = LiveInputSource(SAMPLERATE, CHANNELS, DTYPE, CHUNK_SAMPLES)
         try:
-            while not stop_flag[0]:
-                audio_chunk = audio_queue.get()
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.join(chunks_path, f"chunk_{timestamp}.wav")
-                sf.write(filename, audio_chunk, SAMPLERATE, subtype=SUBTYPE)
-
-                chunk_metadata.append({
-                    "Filename": filename,
-                    "Timestamp": timestamp
-                })
-
-                print(f"🎧 Saved chunk: {filename}")
+            metadata, _ = record_chunks(source, chunks_path, SAMPLERATE, stop_flag=stop_flag)
+            chunk_metadata.extend(metadata)
         finally:
-            stream.stop()
-            stream.close()
             print("✅ Recording session ended.")
 
     listener = keyboard.Listener(on_press=on_press)
@@ -0,0 +1,169 @@
+import threading
+import time
+import types
+import numpy as np
+import soundfile as sf
+
+# Input sources for the recorder. A source is opened with the same callback
+# signature sounddevice uses, callback(indata, frames, time, status), and
+# returns a stream object with start() / stop() / close().
+
+class LiveInputSource:
+    """
+    The microphone, through sounddevice.InputStream (imported only when opened).
+    """
+
+    finished = False  # a live stream never runs out of data
+
+    def __init__(self, samplerate, channels, dtype, blocksize):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize
+
+    def open(self, callback):
+        import sounddevice as sd
+        return sd.InputStream(samplerate=self.samplerate, channels=self.channels,
+                              dtype=self.dtype, callback=callback,
+                              blocksize=self.blocksize)
+
+class _ReplayStream:
+    def __init__(self, source, callback):
+        self._source = source
+        self._callback = callback
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replay-source", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+    def _run(self):
+        src = self._source
+        block_s = src.blocksize / src.samplerate
+        t0 = time.monotonic()
+        k = 0
+        try:
+            for block in src._blocks():
+                if self._stop.is_set():
+                    return
+                if src.speed:
+                    # Deliver block k when it would have finished recording at this speed
+                    delay = t0 + (k + 1) * block_s / src.speed - time.monotonic()
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                now = time.monotonic()
+                time_info = types.SimpleNamespace(inputBufferAdcTime=now - t0, currentTime=now - t0)
+                # status "" is falsy, like an empty sd.CallbackFlags
+                self._callback(block, len(block), time_info, "")
+                k += 1
+        finally:
+            src.finished = True
+
+class ReplaySource:
+    """
+    Feeds a prerecorded or synthetic signal through the recorder callback in
+    blocks of `blocksize` frames.
+
+    signal: a zero-argument factory returning an iterable of 1-D/2-D float
+    arrays, e.g. lambda: synthetic_signal(sr, 30), called on every open() so
+    the source can be replayed. A list of arrays works too; a one-shot iterator
+    (e.g. a bare generator) can only be opened once. The data is consumed
+    lazily and re-blocked; a trailing partial block is dropped, as a real
+    input stream would never deliver one.
+
+    speed: 1.0 = real time, 4.0 = four times faster, None/0 = as fast as possible.
+    An unpaced source measures the writer's maximum rate; run it with an
+    unbounded queue, since with max_queue_blocks the dropped-block count only
+    reflects how much faster the generator is than the writer.
+    """
+
+    def __init__(self, signal, samplerate, channels=1, dtype="float32",
+                 blocksize=None, speed=1.0):
+        self.signal = signal
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize or samplerate
+        self.speed = speed
+        self.finished = False
+        self._opened = False
+        self._data = None
+
+    def open(self, callback):
+        if callable(self.signal):
+            self._data = self.signal()
+        elif self._opened and iter(self.signal) is self.signal:
+            raise RuntimeError("ReplaySource was built from a one-shot iterator and is already "
+                               "used up; pass a factory (e.g. lambda: synthetic_signal(...)) to replay it")
+        else:
+            self._data = self.signal
+        self._opened = True
+        self.finished = False
+        return _ReplayStream(self, callback)
+
+    def _shape(self, x):
+        x = np.asarray(x, dtype=self.dtype)
+        if x.ndim == 1:
+            x = x[:, None]
+        if x.shape[1] != self.channels:
+            x = np.repeat(x[:, :1], self.channels, axis=1)
+        return x
+
+    def _blocks(self):
+        pending = []
+        have = 0
+        for part in self._data:
+            part = self._shape(part)
+            pending.append(part)
+            have += len(part)
+            while have >= self.blocksize:
+                buf = np.concatenate(pending) if len(pending) > 1 else pending[0]
+                yield np.ascontiguousarray(buf[:self.blocksize])
+                rest = buf[self.blocksize:]
+                pending = [rest] if len(rest) else []
+                have = len(rest)
+
+def wav_signal(paths, samplerate, loops=1, read_frames=65536):
+    """
+    Stream the given WAV files back to back (loops times), reading in pieces so
+    long files aren't loaded whole. All files must be at `samplerate`.
+    """
+    for _ in range(loops):
+        for path in paths:
+            with sf.SoundFile(path) as f:
+                if f.samplerate != samplerate:
+                    raise ValueError(f"{path}: samplerate {f.samplerate} != {samplerate}")
+                while True:
+                    data = f.read(read_frames, dtype="float32", always_2d=False)
+                    if len(data) == 0:
+                        break
+                    yield data
+
+def synthetic_signal(samplerate, seconds, kind="noise", freq_hz=1000.0, amplitude=0.1,
+                     piece_seconds=1.0, seed=0):
+    """
+    Generate `seconds` of test audio in pieces: "noise" (white) or "sine".
+    """
+    rng = np.random.default_rng(seed)
+    piece = max(1, int(samplerate * piece_seconds))
+    total = int(samplerate * seconds)
+    done = 0
+    while done < total:
+        n = min(piece, total - done)
+        if kind == "sine":
+            t = (np.arange(done, done + n, dtype=np.float64)) / samplerate
+            x = amplitude * np.sin(2 * np.pi * freq_hz * t)
+        elif kind == "noise":
+            x = amplitude * rng.standard_normal(n)
+        else:
+            raise ValueError(f"Unknown synthetic signal kind: {kind}")
+        yield x.astype(np.float32)
+        done += n
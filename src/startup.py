@@ -0,0 +1,18 @@
+import importlib
+import threading
+
+def warm_up_imports(modules):
+    """
+    Import slow modules on a daemon thread while the user is busy with dialogs,
+    so they are already loaded when a feature needs them.
+    Failures are ignored here; the real error surfaces at the point of use.
+    """
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+    t = threading.Thread(target=run, name="warm-up-imports", daemon=True)
+    t.start()
+    return t
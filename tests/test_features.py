@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+signal = pytest.importorskip("scipy.signal")
+
+from analysis.dsp import band_envelopes, band_error
+from analysis.features import avg_fft, avg_envelope_fft, avg_band_envelope_fft, compute_features
+
+SR = 48000
+MOD_HZ = 37.0
+
+def _am_tone(carrier_hz, seed=None, noise=0.0):
+    t = np.arange(SR) / SR
+    x = (1 + 0.5 * np.cos(2 * np.pi * MOD_HZ * t)) * np.sin(2 * np.pi * carrier_hz * t)
+    if noise:
+        x = x + noise * np.random.default_rng(seed).standard_normal(SR)
+    return x.astype(np.float64)
+
+def test_band_envelope_matches_bandpass_hilbert_reference():
+    x = _am_tone(7000, seed=0, noise=0.2)
+    (env, env_sr), = band_envelopes(x, SR, [(6000, 8000)])
+
+    sos = signal.butter(6, [6000, 8000], btype="bandpass", fs=SR, output="sos")
+    ref = np.abs(signal.hilbert(signal.sosfiltfilt(sos, x)))
+
+    # Compare on the decimated envelope's time grid, away from filter edge transients
+    t_env = np.arange(env.size) / env_sr
+    ref_on_grid = np.interp(t_env, np.arange(SR) / SR, ref)
+    mid = slice(env.size // 10, env.size * 9 // 10)
+    assert env_sr < SR
+    assert np.sqrt(np.mean((env[mid] - ref_on_grid[mid]) ** 2)) < 0.05
+    assert env[mid].mean() == pytest.approx(ref_on_grid[mid].mean(), rel=0.02)
+
+def test_band_envelope_of_clean_am_tone_is_exact():
+    x = _am_tone(7000)
+    (env, env_sr), = band_envelopes(x, SR, [(6000, 8000)])
+    t_env = np.arange(env.size) / env_sr
+    truth = 1 + 0.5 * np.cos(2 * np.pi * MOD_HZ * t_env)
+    np.testing.assert_allclose(env, truth, atol=1e-6)
+
+def test_avg_band_envelope_fft_finds_modulation_per_band():
+    chunks = [_am_tone(7000, seed=i, noise=0.1) + _am_tone(15000, seed=100 + i, noise=0.1) for i in range(3)]
+    spectra = avg_band_envelope_fft(chunks, SR, [(6000, 8000), (14000, 16000)])
+    assert len(spectra) == 2
+    for f, mag in spectra:
+        lo = np.searchsorted(f, 5.0)  # skip DC
+        assert f[lo + np.argmax(mag[lo:])] == pytest.approx(MOD_HZ, abs=0.5)
+
+def test_compute_features_matches_separate_functions():
+    chunks = [_am_tone(7000, seed=i, noise=0.3) for i in range(4)]
+    bands = [(6000, 8000)]
+    feats = compute_features(chunks, SR, do_fft=True, do_env=True, bands=bands)
+
+    f, y = avg_fft(chunks, SR)
+    np.testing.assert_allclose(feats["fft"][0], f)
+    np.testing.assert_allclose(feats["fft"][1], y)
+    f, y = avg_envelope_fft(chunks, SR)
+    np.testing.assert_allclose(feats["env"][0], f)
+    np.testing.assert_allclose(feats["env"][1], y)
+    for (fb, yb), (fr, yr) in zip(feats["bands"], avg_band_envelope_fft(chunks, SR, bands)):
+        np.testing.assert_allclose(fb, fr)
+        np.testing.assert_allclose(yb, yr)
+
+def test_band_outside_nyquist_or_below_one_bin_raises():
+    x = _am_tone(7000)
+    with pytest.raises(ValueError):
+        band_envelopes(x, SR, [(20000, 30000)])
+    with pytest.raises(ValueError):
+        band_envelopes(x, SR, [(100.2, 100.8)])
+
+def test_band_error_explains_unusable_bands():
+    assert band_error(6000, 8000, SR, SR) is None
+    assert "Nyquist" in band_error(50000, 120000, SR, SR)
+    assert "narrower than one FFT bin" in band_error(100.2, 100.8, SR, SR)
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load when a feature needs them, not at startup
+HEAVY = ("numpy", "scipy", "matplotlib", "soundfile", "sounddevice", "pynput")
+
+# Generous bound on the cumulative import time of an entry point (seconds)
+MAX_IMPORT_S = 1.0
+
+CHECK = (
+    "import sys, {mod}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+def _import_entry_point(mod):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHECK.format(mod=mod, heavy=HEAVY)],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+
+    # "import time: self [us] | cumulative | imported package"
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == mod:
+            cumulative_us = int(parts[1])
+    return loaded, cumulative_us
+
+@pytest.mark.parametrize("mod", ["main_analyse", "main_record"])
+def test_entry_point_imports_no_heavy_modules(mod):
+    loaded, _ = _import_entry_point(mod)
+    assert loaded == []
+
+@pytest.mark.parametrize("mod", ["main_analyse", "main_record"])
+def test_entry_point_import_time(mod):
+    _, cumulative_us = _import_entry_point(mod)
+    assert cumulative_us is not None
+    assert cumulative_us / 1e6 < MAX_IMPORT_S
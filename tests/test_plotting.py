@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+from analysis.plotting import render_saved_plots
+
+SR = 8000
+BASENAMES = ("avg_fft", "avg_envelope_fft", "concat_time", "band_envelope_fft")
+FORMATS = ("svg", "png", "pdf")
+
+def _results():
+    rng = np.random.default_rng(0)
+    chunks = [rng.standard_normal(SR).astype("float32") for _ in range(3)]
+    return {"samplerate": SR, "instances": ["instance_a", "instance_b"],
+            "chunks": {"instance_a": chunks, "instance_b": chunks[:2]}}
+
+@pytest.mark.parametrize("workers", [1, None])
+def test_render_saved_plots_writes_every_format(tmp_path, workers):
+    saved = render_saved_plots(_results(), str(tmp_path), formats=FORMATS, max_seconds=2,
+                               bands=[(500, 1500)], workers=workers)
+
+    expected = {str(tmp_path / f"{base}.{fmt}") for base in BASENAMES for fmt in FORMATS}
+    assert set(saved) == expected
+    for path in expected:
+        assert os.path.getsize(path) > 0
+
+def test_render_saved_plots_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        render_saved_plots(_results(), str(tmp_path), formats=["svg", "bmp"], workers=1)
+
+def test_render_saved_plots_empty_selection(tmp_path):
+    empty = {"samplerate": None, "instances": [], "chunks": {}}
+    assert render_saved_plots(empty, str(tmp_path)) == []
+    assert render_saved_plots(_results(), str(tmp_path), do_fft=False, do_env=False,
+                              do_time=False, workers=1) == []
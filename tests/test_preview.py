@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("scipy")
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+from analysis.preview import stratified_order, preview_avg_fft
+
+SR = 8000
+
+def test_stratified_order_is_a_permutation():
+    for n in (1, 2, 7, 16, 37, 100):
+        assert sorted(stratified_order(n)) == list(range(n))
+
+def test_stratified_order_prefixes_are_spread_in_time():
+    order = stratified_order(64)
+    assert order[:4] == [0, 32, 16, 48]
+    # Any prefix of 8 leaves no gap wider than 64 / 8 chunks
+    first = sorted(order[:8])
+    assert max(np.diff(first + [64])) <= 8
+
+def test_preview_stops_early_at_target_error(tmp_path):
+    chunks_dir = tmp_path / "instance_a" / "chunks"
+    chunks_dir.mkdir(parents=True)
+    rng = np.random.default_rng(0)
+    t = np.arange(SR) / SR
+    for i in range(200):
+        x = 3 * np.sin(2 * np.pi * 440 * t) + 2 * np.sin(2 * np.pi * 1200 * t) + rng.standard_normal(SR)
+        sf.write(os.path.join(chunks_dir, f"chunk_{i:06d}.wav"), x.astype("float32"), SR, subtype="FLOAT")
+
+    prog = preview_avg_fft(str(tmp_path), target_rel_sem=0.05, refresh_s=0.01)
+
+    assert prog.processed < prog.total_chunks
+    assert prog.rel_sem(3000) <= 0.05
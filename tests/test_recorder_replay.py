@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+from recording.recorder import record_chunks
+from recording.sources import ReplaySource, synthetic_signal
+from recording.bench import stalling_writer, stop_after_blocks
+
+SR = 8000
+
+def test_unpaced_replay_writes_every_block(tmp_path):
+    source = ReplaySource(lambda: synthetic_signal(SR, 4), SR, speed=None)
+    metadata, stats = record_chunks(source, str(tmp_path), SR, verbose=False)
+
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 4
+    assert len({m["Filename"] for m in metadata}) == 4
+    assert stats["blocks_written"] == 4
+    assert stats["discarded_on_stop"] == 0
+
+def test_replay_source_can_be_reopened(tmp_path):
+    source = ReplaySource(lambda: synthetic_signal(SR, 2), SR, speed=None)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    _, first = record_chunks(source, str(tmp_path / "a"), SR, verbose=False)
+    _, second = record_chunks(source, str(tmp_path / "b"), SR, verbose=False)
+    assert first["blocks_written"] == second["blocks_written"] == 2
+
+def test_disk_stall_with_bounded_queue_drops_blocks(tmp_path):
+    source = ReplaySource(lambda: synthetic_signal(SR, 10), SR, speed=20.0)
+    _, stats = record_chunks(source, str(tmp_path), SR, max_queue_blocks=1,
+                             writer=stalling_writer(0.3, every_n=2), verbose=False)
+    assert stats["dropped_blocks"] > 0
+    assert stats["max_queue_depth"] <= 1
+
+def test_stop_after_blocks(tmp_path):
+    source = ReplaySource(lambda: synthetic_signal(SR, 20), SR, speed=None)
+    _, stats = record_chunks(source, str(tmp_path), SR,
+                             stop_condition=stop_after_blocks(3), verbose=False)
+    assert stats["blocks_written"] == 3
+    assert len(os.listdir(tmp_path)) == 3
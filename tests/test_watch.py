@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("scipy")
+pytest.importorskip("matplotlib")
+
+from analysis.watch import SessionWatcher
+
+SR = 8000
+
+def _write_chunks(chunks_dir, start, count):
+    rng = np.random.default_rng(start)
+    for i in range(start, start + count):
+        x = rng.standard_normal(SR).astype("float32")
+        sf.write(os.path.join(chunks_dir, f"chunk_{i:06d}.wav"), x, SR, subtype="FLOAT")
+
+def test_watch_empty_chunks_folder_counts_each_chunk_once(tmp_path):
+    chunks_dir = tmp_path / "instance_a_1_x" / "chunks"
+    chunks_dir.mkdir(parents=True)
+
+    watcher = SessionWatcher(str(chunks_dir))
+    assert watcher.poll() == 0
+
+    _write_chunks(str(chunks_dir), 0, 3)
+    assert watcher.poll() == 3
+    assert watcher.chunk_counts() == {"instance_a_1_x": 3}
+
+    _write_chunks(str(chunks_dir), 3, 1)
+    assert watcher.poll() == 1
+    assert watcher.chunk_counts() == {"instance_a_1_x": 4}
+
+def test_watch_session_before_first_instance(tmp_path):
+    session = tmp_path / "session"
+    session.mkdir()
+
+    watcher = SessionWatcher(str(session))
+    assert watcher.poll() == 0
+
+    chunks_dir = session / "instance_b_2_y" / "chunks"
+    chunks_dir.mkdir(parents=True)
+    _write_chunks(str(chunks_dir), 0, 2)
+    assert watcher.poll() == 2
+    assert watcher.chunk_counts() == {"instance_b_2_y": 2}